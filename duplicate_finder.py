@@ -3,37 +3,220 @@ import argparse
 from pathlib import Path
 from PIL import Image, ImageTk
 import imagehash
-from sentence_transformers import SentenceTransformer, util
+import numpy as np
+from sentence_transformers import SentenceTransformer
+import torch
 import customtkinter as ctk
 import threading
 import queue
+import contextlib
+import hashlib
+import time
 import tkinter.filedialog as filedialog
-
-# Helper class for Disjoint Set Union (DSU) to find connected components
-class DisjointSet:
-    def __init__(self, elements):
-        self.parent = {element: element for element in elements}
-        self.rank = {element: 0 for element in elements}
-
-    def find(self, element):
-        if self.parent[element] == element:
-            return element
-        self.parent[element] = self.find(self.parent[element])
-        return self.parent[element]
-
-    def union(self, element1, element2):
-        root1 = self.find(element1)
-        root2 = self.find(element2)
-        if root1 != root2:
-            if self.rank[root1] < self.rank[root2]:
-                self.parent[root1] = root2
-            elif self.rank[root1] > self.rank[root2]:
-                self.parent[root2] = root1
-            else:
-                self.parent[root2] = root1
-                self.rank[root1] += 1
-            return True
-        return False
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+
+try:
+    import faiss # Optional: accelerates the global similarity search
+except ImportError:
+    faiss = None
+
+try:
+    import simsimd # Optional: SIMD cosine kernels for the CPU similarity pass
+except ImportError:
+    simsimd = None
+
+try:
+    import onnxruntime # Optional: AOT-compiled vision tower for CPU scans
+except ImportError:
+    onnxruntime = None
+
+try:
+    import numba # Optional: JIT-compiled pairwise kernel for CPU-only runs
+except ImportError:
+    numba = None
+
+if numba is not None:
+    # The default TBB threading layer hangs interpreter shutdown when the
+    # parallel kernels run off the main thread (they run on the worker
+    # thread here), and it is left in an invalid state by the fork-based
+    # hashing pool; workqueue has neither problem
+    numba.config.THREADING_LAYER = 'workqueue'
+
+# On-disk cache of preprocessed CLIP input tensors, so images are not
+# JPEG-decoded again for every scan
+PIXEL_CACHE_DIR = Path.home() / '.cache' / 'image-duplicate-finder' / 'pixel_values'
+
+# On-disk cache of finished embeddings keyed by file content, so unchanged
+# libraries skip the encoder entirely on rescans
+EMBEDDING_CACHE_DIR = Path.home() / '.cache' / 'image-duplicate-finder' / 'embeddings'
+
+# Pairwise kernels specialized per embedding dimension, keyed by d
+_PAIR_KERNELS_BY_DIM = {}
+
+def _pair_kernels_for_dim(d):
+    # numba specializes on dtypes, not shapes, so the generic kernel keeps a
+    # runtime inner-loop bound. Baking the dimension into the source as a
+    # literal lets LLVM fully unroll and vectorize the dot product. The
+    # two-pass scheme (count matches per row, then fill at per-row offsets)
+    # lets prange rows write results without locking.
+    if d in _PAIR_KERNELS_BY_DIM:
+        return _PAIR_KERNELS_BY_DIM[d]
+    source = f'''
+def count_kernel(embeddings, threshold, counts):
+    n = embeddings.shape[0]
+    for i in numba.prange(n):
+        row_count = 0
+        for j in range(i + 1, n):
+            score = 0.0
+            for k in range({d}):
+                score += embeddings[i, k] * embeddings[j, k]
+            if score >= threshold:
+                row_count += 1
+        counts[i] = row_count
+
+def fill_kernel(embeddings, threshold, offsets, out_i, out_j):
+    n = embeddings.shape[0]
+    for i in numba.prange(n):
+        pos = offsets[i]
+        for j in range(i + 1, n):
+            score = 0.0
+            for k in range({d}):
+                score += embeddings[i, k] * embeddings[j, k]
+            if score >= threshold:
+                out_i[pos] = i
+                out_j[pos] = j
+                pos += 1
+'''
+    namespace = {'numba': numba}
+    exec(source, namespace)
+    kernels = (numba.njit(parallel=True, fastmath=True)(namespace['count_kernel']),
+               numba.njit(parallel=True, fastmath=True)(namespace['fill_kernel']))
+    _PAIR_KERNELS_BY_DIM[d] = kernels
+    return kernels
+
+# CPU math defaults: use every core for intra-op work, keep inter-op small,
+# and allow TF32 matmuls on Ampere+ GPUs. Thread counts must be set before
+# torch runs its first parallel op.
+torch.set_num_threads(os.cpu_count() or 1)
+try:
+    torch.set_num_interop_threads(2)
+except RuntimeError:
+    pass # Torch already started its op pool; keep its default
+torch.backends.cuda.matmul.allow_tf32 = True
+
+ONNX_CACHE_DIR = Path.home() / '.cache' / 'image-duplicate-finder' / 'onnx'
+
+class _OnnxVisionTower:
+    # Minimal stand-in for the HF CLIP model exposing only the
+    # get_image_features entry point the worker calls
+    def __init__(self, session):
+        self.session = session
+
+    def get_image_features(self, pixel_values):
+        (features,) = self.session.run(
+            None, {'pixel_values': pixel_values.cpu().numpy().astype(np.float32)})
+        return torch.from_numpy(features)
+
+def _try_onnx_vision_tower(clip_model, model_name):
+    # Export the vision tower once (fixed 224x224 input, dynamic batch) and
+    # run it through ONNX Runtime's graph-optimized CPU kernels
+    if onnxruntime is None:
+        return None
+    onnx_path = ONNX_CACHE_DIR / (model_name.replace('/', '_') + '.onnx')
+    try:
+        if not onnx_path.exists():
+            ONNX_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+            class ImageFeatureWrapper(torch.nn.Module):
+                def __init__(self, inner):
+                    super().__init__()
+                    self.inner = inner
+
+                def forward(self, pixel_values):
+                    return self.inner.get_image_features(pixel_values=pixel_values)
+
+            torch.onnx.export(ImageFeatureWrapper(clip_model),
+                              torch.zeros((1, 3, 224, 224)),
+                              str(onnx_path),
+                              input_names=['pixel_values'],
+                              output_names=['image_features'],
+                              dynamic_axes={'pixel_values': {0: 'batch'},
+                                            'image_features': {0: 'batch'}})
+        return _OnnxVisionTower(onnxruntime.InferenceSession(str(onnx_path)))
+    except Exception as e:
+        print(f"ONNX export unavailable, keeping the torch model: {e}")
+        return None
+
+
+# CLIP models shared across scans: reloading ~150 MB of weights (and
+# re-warming the JIT) for every worker dominated scan startup
+_MODEL_CACHE = {}
+
+def get_model(model_name, device):
+    cache_key = (model_name, device)
+    if cache_key in _MODEL_CACHE:
+        return _MODEL_CACHE[cache_key]
+    model = SentenceTransformer(model_name, device=device)
+    model.eval() # Scans are inference-only
+    if device == 'cuda':
+        model.half() # FP16 weights engage tensor cores on CUDA
+    clip_module = model._first_module()
+    # channels_last lets the patch-embedding conv hit the vectorized kernels
+    clip_module.model = clip_module.model.to(memory_format=torch.channels_last)
+    if device == 'cpu':
+        onnx_tower = _try_onnx_vision_tower(clip_module.model, model_name)
+        if onnx_tower is not None:
+            clip_module.model = onnx_tower
+            _MODEL_CACHE[cache_key] = model
+            return model
+    try:
+        # Compile get_image_features itself — compiling the module would only
+        # route forward(), which nothing here calls — and warm it with one
+        # dummy forward; fall back to eager if no compile backend is
+        # available on this machine
+        compiled = torch.compile(clip_module.model.get_image_features,
+                                 mode='reduce-overhead')
+        dummy = torch.zeros((1, 3, 224, 224), device=device,
+                            dtype=next(clip_module.model.parameters()).dtype)
+        with torch.inference_mode():
+            compiled(pixel_values=dummy)
+        clip_module.model.get_image_features = compiled
+    except Exception as e:
+        print(f"torch.compile unavailable, keeping eager model: {e}")
+    _MODEL_CACHE[cache_key] = model
+    return model
+
+
+# Array-backed DSU over integer indices 0..n-1, avoiding per-element dict
+# hashing when the elements are already positions in a list
+class IntDSU:
+    def __init__(self, n):
+        self.parent = np.arange(n, dtype=np.int32)
+        self.rank = np.zeros(n, dtype=np.int8)
+
+    def find(self, x):
+        root = x
+        while self.parent[root] != root:
+            root = self.parent[root]
+        # Second pass compresses the walked path straight onto the root
+        while self.parent[x] != root:
+            next_x = self.parent[x]
+            self.parent[x] = root
+            x = next_x
+        return root
+
+    def union(self, x, y):
+        root_x = self.find(x)
+        root_y = self.find(y)
+        if root_x == root_y:
+            return False
+        if self.rank[root_x] < self.rank[root_y]:
+            root_x, root_y = root_y, root_x
+        self.parent[root_y] = root_x
+        if self.rank[root_x] == self.rank[root_y]:
+            self.rank[root_x] += 1
+        return True
 
 
 class DuplicateFinderWorker(threading.Thread):
@@ -41,9 +224,305 @@ class DuplicateFinderWorker(threading.Thread):
         super().__init__()
         self.directory_path = directory_path
         self.data_queue = data_queue
-        self.model = SentenceTransformer(model_name)
+        # Prefer GPU (CUDA, then Apple MPS) over CPU for the CLIP encoder
+        if torch.cuda.is_available():
+            self.device = 'cuda'
+        elif torch.backends.mps.is_available():
+            self.device = 'mps'
+        else:
+            self.device = 'cpu'
+        self.model_name = model_name
+        self.model = get_model(model_name, self.device)
+        if self.device == 'cuda':
+            torch.backends.cudnn.benchmark = True
+        # Grab the CLIP submodule and its image processor once, so the encode
+        # loop never goes through SentenceTransformer.encode's per-call
+        # PIL preprocessing
+        self.clip_module = self.model._first_module()
+        self.processor = self.clip_module.processor
         self.stop_event = threading.Event() # For stopping the thread gracefully
 
+    def _pixel_cache_path(self, path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        cache_key = f"{path}:{stat.st_mtime_ns}:{stat.st_size}"
+        return PIXEL_CACHE_DIR / (hashlib.md5(cache_key.encode()).hexdigest() + '.npy')
+
+    def _load_pixel_values(self, path):
+        # Preprocessed CLIP input tensor for one image, via the on-disk cache
+        # keyed by (path, mtime, size) so stale entries never match
+        cache_path = self._pixel_cache_path(path)
+        if cache_path is not None and cache_path.exists():
+            try:
+                return torch.from_numpy(np.load(cache_path)).float()
+            except Exception as e:
+                print(f"Worker: Ignoring unreadable cache entry for {path}: {e}")
+        with Image.open(path) as img:
+            pixel_values = self.processor(images=img.convert('RGB'), return_tensors='pt')['pixel_values'][0]
+        if cache_path is not None:
+            try:
+                PIXEL_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                np.save(cache_path, pixel_values.numpy().astype(np.float16))
+            except OSError as e:
+                print(f"Worker: Could not write cache entry for {path}: {e}")
+        return pixel_values
+
+    def _embedding_cache_path(self, path):
+        # Content-keyed (via the same cheap fingerprint used for the no-CLIP
+        # fast path) plus the model name, so renames still hit and model
+        # swaps never collide
+        fingerprint = content_fingerprint(path)
+        if fingerprint is None:
+            return None
+        cache_key = f"{self.model_name}:{fingerprint[0]}:{fingerprint[1]}"
+        return EMBEDDING_CACHE_DIR / (hashlib.md5(cache_key.encode()).hexdigest() + '.npy')
+
+    def _load_cached_embedding(self, path):
+        cache_path = self._embedding_cache_path(path)
+        if cache_path is not None and cache_path.exists():
+            try:
+                return torch.from_numpy(np.load(cache_path)).float().to(self.device)
+            except Exception as e:
+                print(f"Worker: Ignoring unreadable embedding cache entry for {path}: {e}")
+        return None
+
+    def _store_cached_embedding(self, path, embedding):
+        cache_path = self._embedding_cache_path(path)
+        if cache_path is None:
+            return
+        try:
+            EMBEDDING_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            np.save(cache_path, embedding.cpu().float().numpy().astype(np.float16))
+        except OSError as e:
+            print(f"Worker: Could not write embedding cache entry for {path}: {e}")
+
+    def _autotune_batch_size(self):
+        # Encoder throughput is non-monotonic in batch size on a GPU (too
+        # small leaves the device idle, too large thrashes memory), so probe
+        # a few candidates with dummy batches and keep the fastest. On CPU
+        # the curve is flat and the trial forwards are pure overhead
+        if self.device == 'cpu':
+            return 64
+        best_size, best_rate = None, 0.0
+        for trial_size in (8, 32, 128, 256):
+            try:
+                dummy = torch.zeros((trial_size, 3, 224, 224), device=self.device)
+                with torch.inference_mode(), self._autocast_context():
+                    self.clip_module.model.get_image_features(pixel_values=dummy) # Warm-up
+                    self._synchronize_device()
+                    started = time.perf_counter()
+                    self.clip_module.model.get_image_features(pixel_values=dummy)
+                    self._synchronize_device()
+                rate = trial_size / (time.perf_counter() - started)
+            except RuntimeError as e:
+                # Typically out of memory; larger sizes will not fare better
+                print(f"Worker: batch size {trial_size} failed during autotune: {e}")
+                break
+            if best_size is None or rate > best_rate:
+                best_size, best_rate = trial_size, rate
+        # If even the smallest trial failed, stay at that size rather than
+        # falling back to a larger default that is sure to fail too
+        return best_size if best_size is not None else 8
+
+    def _synchronize_device(self):
+        # Drain queued kernels so perf_counter measures execution, not
+        # dispatch — both CUDA and MPS launch asynchronously
+        if self.device == 'cuda':
+            torch.cuda.synchronize()
+        elif self.device == 'mps':
+            torch.mps.synchronize()
+
+    def _autocast_context(self):
+        # FP16 autocast on GPU; a no-op context on CPU where FP16 is slower
+        if self.device in ('cuda', 'mps'):
+            return torch.autocast(device_type=self.device, dtype=torch.float16)
+        return contextlib.nullcontext()
+
+    def _similar_pairs(self, embeddings, threshold):
+        # All (i, j) index pairs with cosine similarity >= threshold, i < j.
+        # FAISS retrieves them with one cache-blocked range_search when it is
+        # installed; otherwise a blocked matmul over the normalized embeddings
+        # avoids materializing the full n x n matrix.
+        if self.device != 'cpu':
+            # On an accelerator, keep the whole pass on-device in half
+            # precision: the normalized embeddings tolerate BF16/FP16 rounding
+            # at this threshold, the matmul runs on tensor cores, and the only
+            # host transfer left is the sparse set of matching indices
+            half_dtype = (torch.bfloat16 if self.device == 'cuda' and torch.cuda.is_bf16_supported()
+                          else torch.float16)
+            with torch.inference_mode():
+                half_embeddings = embeddings.to(half_dtype)
+                pair_indices = []
+                block_size = 1024
+                for row_start in range(0, half_embeddings.shape[0], block_size):
+                    if self.stop_event.is_set():
+                        break
+                    scores = half_embeddings[row_start:row_start + block_size] @ half_embeddings.T
+                    block_mask = torch.triu(scores >= threshold, diagonal=row_start + 1)
+                    for local_i, j in block_mask.nonzero(as_tuple=False).cpu().tolist():
+                        pair_indices.append((row_start + local_i, j))
+                return pair_indices
+
+        if faiss is not None:
+            embeddings_np = np.ascontiguousarray(embeddings.cpu().float().numpy())
+            index = faiss.IndexFlatIP(embeddings_np.shape[1])
+            index.add(embeddings_np)
+            lims, _, neighbors = index.range_search(embeddings_np, threshold)
+            # Expand the CSR-style lims offsets into one row index per result,
+            # then keep the upper triangle — no per-element Python filtering.
+            # lims is uint64, which np.repeat refuses as a repeat count
+            rows = np.repeat(np.arange(len(embeddings_np)), np.diff(lims).astype(np.int64))
+            upper = rows < neighbors
+            return list(zip(rows[upper].tolist(), neighbors[upper].tolist()))
+
+        if simsimd is not None and self.device == 'cpu':
+            # SimSIMD's hand-vectorized cosine kernels beat the torch CPU
+            # matmul on small blocks; it reports distances, so flip the
+            # threshold to 1 - cos
+            embeddings_np = np.ascontiguousarray(embeddings.cpu().float().numpy())
+            max_distance = 1.0 - threshold
+            pair_indices = []
+            block_size = 1024
+            for row_start in range(0, len(embeddings_np), block_size):
+                if self.stop_event.is_set():
+                    break
+                distances = np.asarray(simsimd.cdist(
+                    embeddings_np[row_start:row_start + block_size],
+                    embeddings_np, metric='cosine'))
+                block_mask = np.triu(distances <= max_distance, k=row_start + 1)
+                for local_i, j in np.argwhere(block_mask):
+                    pair_indices.append((row_start + int(local_i), int(j)))
+            return pair_indices
+
+        if numba is not None:
+            # JIT-compiled kernel sidesteps torch's per-call dispatch overhead
+            # on CPU; the first scan pays the compile, later scans reuse it
+            embeddings_np = np.ascontiguousarray(embeddings.cpu().float().numpy())
+            count_kernel, fill_kernel = _pair_kernels_for_dim(embeddings_np.shape[1])
+            counts = np.zeros(len(embeddings_np), dtype=np.int64)
+            count_kernel(embeddings_np, threshold, counts)
+            offsets = np.cumsum(counts) - counts
+            out_i = np.empty(int(counts.sum()), dtype=np.int64)
+            out_j = np.empty(int(counts.sum()), dtype=np.int64)
+            fill_kernel(embeddings_np, threshold, offsets, out_i, out_j)
+            return list(zip(out_i.tolist(), out_j.tolist()))
+
+        # Quantize the normalized embeddings to int8 with a single global
+        # scale; the >= 0.98 threshold is tolerant of the rounding, and int8
+        # storage cuts the embedding matrix to a quarter of its FP32 size.
+        # The threshold comparison moves into the quantized domain.
+        # inference_mode here as well: nothing in the similarity pass needs
+        # autograd version counters or view tracking either
+        with torch.inference_mode():
+            quantized = (embeddings * 127.0).round().clamp(-127, 127).to(torch.int8)
+            scaled_threshold = threshold * 127.0 * 127.0
+
+            # Tile the pairwise computation so each score block and its two
+            # operand tiles stay cache-resident; only the int8 matrix is ever
+            # held at full size, and only the upper-triangular tiles are
+            # visited
+            pair_indices = []
+            tile_size = 128
+            n = quantized.shape[0]
+            for i0 in range(0, n, tile_size):
+                if self.stop_event.is_set():
+                    break
+                row_tile = quantized[i0:i0 + tile_size].float()
+                for j0 in range(i0, n, tile_size):
+                    scores = row_tile @ quantized[j0:j0 + tile_size].float().t()
+                    tile_mask = scores >= scaled_threshold
+                    if i0 == j0:
+                        tile_mask = torch.triu(tile_mask, diagonal=1)
+                    for local_i, local_j in tile_mask.nonzero(as_tuple=False).tolist():
+                        pair_indices.append((i0 + local_i, j0 + local_j))
+            return pair_indices
+
+    def _encode_entries(self, all_entries, encode_order, embeddings_by_entry):
+        # Only worth probing batch sizes when there is enough work to
+        # amortize the trial forwards
+        batch_size = self._autotune_batch_size() if len(encode_order) > 512 else 64
+        batch_slices = [encode_order[start:start + batch_size]
+                        for start in range(0, len(encode_order), batch_size)]
+        batch_queue = queue.Queue(maxsize=4)
+
+        def load_one(entry_idx):
+            try:
+                return entry_idx, self._load_pixel_values(all_entries[entry_idx][1])
+            except Exception as e:
+                print(f"Worker: Could not load image {all_entries[entry_idx][1]} for embedding: {e}")
+                return entry_idx, None
+
+        def prefetch_batches():
+            # Decode and preprocess on a thread pool (image decode releases
+            # the GIL) so ready batches queue up while the encoder runs
+            with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 4)) as pool:
+                for batch_slice in batch_slices:
+                    if self.stop_event.is_set():
+                        break
+                    loaded = list(pool.map(load_one, batch_slice))
+                    batch_entry_indices = [entry_idx for entry_idx, tensor in loaded if tensor is not None]
+                    batch_tensors = [tensor for entry_idx, tensor in loaded if tensor is not None]
+                    if batch_tensors:
+                        batch_queue.put((batch_entry_indices, batch_tensors))
+            batch_queue.put(None) # Sentinel: no more batches
+
+        prefetch_thread = threading.Thread(target=prefetch_batches, daemon=True)
+        prefetch_thread.start()
+
+        while True:
+            batch = batch_queue.get()
+            if batch is None:
+                break
+            if self.stop_event.is_set():
+                continue # Keep draining so the producer can reach its sentinel
+            batch_entry_indices, batch_tensors = batch
+            pixel_values = torch.stack(batch_tensors)
+            if self.device == 'cuda':
+                # non_blocking copies only overlap compute from pinned memory
+                pixel_values = pixel_values.pin_memory()
+            pixel_values = pixel_values.to(self.device, non_blocking=True)
+            with torch.inference_mode(), self._autocast_context():
+                features = self.clip_module.model.get_image_features(pixel_values=pixel_values)
+                batch_embeddings = torch.nn.functional.normalize(features, dim=-1)
+            for pos, entry_idx in enumerate(batch_entry_indices):
+                embeddings_by_entry[entry_idx] = batch_embeddings[pos]
+                self._store_cached_embedding(all_entries[entry_idx][1], batch_embeddings[pos])
+        prefetch_thread.join()
+
+    def _encode_entries_multi_gpu(self, all_entries, encode_order, embeddings_by_entry):
+        # Fan the encode work across every CUDA device with
+        # sentence-transformers' worker pool. This path goes through
+        # model.encode's own preprocessing, so it skips the pixel-tensor
+        # cache, but near-linear multi-GPU scaling wins on large scans.
+        target_devices = [f'cuda:{device_idx}' for device_idx in range(torch.cuda.device_count())]
+        pool = self.model.start_multi_process_pool(target_devices=target_devices)
+        try:
+            chunk_size = 512 # Bounds how many decoded PIL images are alive at once
+            for start in range(0, len(encode_order), chunk_size):
+                if self.stop_event.is_set():
+                    break
+                images = []
+                kept_indices = []
+                for entry_idx in encode_order[start:start + chunk_size]:
+                    try:
+                        with Image.open(all_entries[entry_idx][1]) as img:
+                            images.append(img.convert('RGB'))
+                        kept_indices.append(entry_idx)
+                    except Exception as e:
+                        print(f"Worker: Could not open image {all_entries[entry_idx][1]} for embedding: {e}")
+                if not images:
+                    continue
+                chunk_embeddings = self.model.encode_multi_process(images, pool, batch_size=64,
+                                                                   normalize_embeddings=True)
+                chunk_embeddings = torch.from_numpy(chunk_embeddings).to(self.device)
+                for pos, entry_idx in enumerate(kept_indices):
+                    embeddings_by_entry[entry_idx] = chunk_embeddings[pos]
+                    self._store_cached_embedding(all_entries[entry_idx][1], chunk_embeddings[pos])
+        finally:
+            self.model.stop_multi_process_pool(pool)
+
     def run(self):
         try:
             self.data_queue.put(("status", "Phase 1: Discovering image files..."))
@@ -55,83 +534,133 @@ class DuplicateFinderWorker(threading.Thread):
             self.data_queue.put(("status", f"Found {len(image_paths)} image files."))
 
             self.data_queue.put(("status", "Phase 2: Computing perceptual hashes..."))
-            image_groups = compute_hashes(image_paths)
-            num_prefiltered_groups = len(image_groups)
-            self.data_queue.put(("status", f"Pre-filtered into {num_prefiltered_groups} groups of potential duplicates."))
+            hashes = compute_hashes(image_paths,
+                                    status_callback=lambda msg: self.data_queue.put(("status", msg)))
+            confident_groups, candidate_groups = group_by_hamming(hashes)
+
+            # Only skip CLIP when the files also agree on size and a content
+            # fingerprint; near-identical hashes over differing bytes still go
+            # through the encoder like any other candidate group
+            hash_only_groups = []
+            for group in confident_groups:
+                fingerprints = {content_fingerprint(p) for p in group}
+                if len(fingerprints) == 1 and None not in fingerprints:
+                    hash_only_groups.append(group)
+                else:
+                    candidate_groups.append(group)
+            confident_groups = hash_only_groups
+
+            self.data_queue.put(("status",f"Pre-filtered into {len(candidate_groups)} groups of potential duplicates "
+                                           f"({len(confident_groups)} confirmed by hash distance alone)."))
 
-            if num_prefiltered_groups == 0:
-                self.data_queue.put(("status", "No potential duplicates identified by perceptual hashing. Exiting worker."))
+            total_duplicate_groups_found = 0
+            # Near-identical hashes are high-confidence duplicates; emit them
+            # without paying for a CLIP forward pass
+            for group in confident_groups:
+                self.data_queue.put(("duplicate_group", group))
+                total_duplicate_groups_found += 1
+
+            if not candidate_groups:
+                if not confident_groups:
+                    self.data_queue.put(("status", "No potential duplicates identified by perceptual hashing. Exiting worker."))
+                else:
+                    self.data_queue.put(("status", f"Identified {total_duplicate_groups_found} duplicate groups from perceptual hashes."))
                 self.data_queue.put(("done", None))
                 return
 
             self.data_queue.put(("status", "Phase 3: Generating AI embeddings and calculating similarity..."))
-            
-            total_duplicate_groups_found = 0
-            for pre_filtered_sub_group_paths in image_groups.values():
-                if self.stop_event.is_set():
-                    break
 
-                # Process THIS pre_filtered_sub_group_paths only
-                images = []
-                valid_group_paths = []
-                for p in pre_filtered_sub_group_paths:
-                    if self.stop_event.is_set():
-                        break
-                    try:
-                        img = Image.open(p)
-                        images.append(img)
-                        valid_group_paths.append(p)
-                    except Exception as e:
-                        print(f"Worker: Could not open image {p} for embedding: {e}")
-                
-                if self.stop_event.is_set():
-                    break
+            # Flatten all candidate images across all pre-filtered groups so the
+            # model sees a few large batches instead of many tiny per-group ones.
+            all_entries = [(group_idx, p)
+                           for group_idx, pre_filtered_sub_group_paths in enumerate(candidate_groups)
+                           for p in pre_filtered_sub_group_paths]
+
+            # Satisfy entries from the embedding cache first; only misses go
+            # through the encoder
+            embeddings_by_entry = [None] * len(all_entries)
+            uncached_entry_indices = []
+            for entry_idx, (group_idx, path) in enumerate(all_entries):
+                cached_embedding = self._load_cached_embedding(path)
+                if cached_embedding is not None:
+                    embeddings_by_entry[entry_idx] = cached_embedding
+                else:
+                    uncached_entry_indices.append(entry_idx)
+            if len(uncached_entry_indices) < len(all_entries):
+                self.data_queue.put(("status",
+                                     f"Phase 3: {len(all_entries) - len(uncached_entry_indices)} of "
+                                     f"{len(all_entries)} embeddings served from cache."))
+
+            # Sort by resolution so each mini-batch holds similarly-sized images
+            # (smart batching), then scatter embeddings back to original
+            # positions. Reading the size touches only the header, no pixel
+            # decode, and is skipped entirely for cache hits.
+            def header_area(entry_idx):
+                try:
+                    with Image.open(all_entries[entry_idx][1]) as img:
+                        width, height = img.size
+                    return width * height
+                except Exception:
+                    return 0 # Unreadable files surface properly in the load step
+
+            encode_order = sorted(uncached_entry_indices, key=header_area)
+            if self.device == 'cuda' and torch.cuda.device_count() > 1 and encode_order:
+                self._encode_entries_multi_gpu(all_entries, encode_order, embeddings_by_entry)
+            else:
+                self._encode_entries(all_entries, encode_order, embeddings_by_entry)
 
-                if not images or len(images) < 2: # Need at least 2 images to form a duplicate group
-                    continue
+            if self.stop_event.is_set():
+                self.data_queue.put(("status", "Worker stopped during embedding generation."))
+                self.data_queue.put(("done", None))
+                return
 
-                embeddings = self.model.encode(images, convert_to_tensor=True)
-                for img in images:
-                    img.close() # Close images after encoding
-
-                cos_scores = util.cos_sim(embeddings, embeddings)
-                
-                current_sub_group_potential_duplicates = []
-                for i in range(len(cos_scores) - 1):
-                    for j in range(i + 1, len(cos_scores)):
-                        if self.stop_event.is_set():
-                            break
-                        if cos_scores[i][j] >= 0.98: # Threshold
-                            current_sub_group_potential_duplicates.append((valid_group_paths[i], valid_group_paths[j]))
-                
-                if self.stop_event.is_set():
-                    break
+            # One global similarity pass over all candidate embeddings instead
+            # of a per-group loop: gather every (i, j) edge above threshold in
+            # one shot, then union the edges in a single DSU
+            valid_entry_indices = [entry_idx for entry_idx in range(len(all_entries))
+                                   if embeddings_by_entry[entry_idx] is not None]
+            if len(valid_entry_indices) >= 2:
+                valid_paths = [all_entries[entry_idx][1] for entry_idx in valid_entry_indices]
+                all_embeddings = torch.stack([embeddings_by_entry[entry_idx]
+                                              for entry_idx in valid_entry_indices])
+                pair_indices = self._similar_pairs(all_embeddings, threshold=0.98)
+
+                if pair_indices:
+                    dsu = IntDSU(len(valid_paths))
+
+                    # Paths sharing an exact phash are already transitively
+                    # linked, so a single confirmed CLIP pair inside such a
+                    # bucket confirms the whole bucket — union it wholesale
+                    # instead of waiting for every pairwise edge
+                    hash_by_path = {path: hash_int for hash_int, paths in hashes.items()
+                                    for path in paths}
+                    entry_hashes = [hash_by_path.get(path) for path in valid_paths]
+                    bucket_members = {}
+                    for path_idx, hash_int in enumerate(entry_hashes):
+                        bucket_members.setdefault(hash_int, []).append(path_idx)
+
+                    confirmed_buckets = set()
+                    for i, j in pair_indices:
+                        dsu.union(i, j)
+                        hash_int = entry_hashes[i]
+                        if (hash_int is not None and hash_int == entry_hashes[j]
+                                and hash_int not in confirmed_buckets):
+                            confirmed_buckets.add(hash_int)
+                            members = bucket_members[hash_int]
+                            for member in members[1:]:
+                                dsu.union(members[0], member)
+
+                    roots = np.array([dsu.find(i) for i in range(len(valid_paths))])
+                    unique_roots, root_buckets = np.unique(roots, return_inverse=True)
+                    grouped_paths = [[] for _ in range(len(unique_roots))]
+                    for path_idx, bucket_idx in enumerate(root_buckets):
+                        grouped_paths[bucket_idx].append(valid_paths[path_idx])
+
+                    for group in grouped_paths:
+                        if len(group) > 1:
+                            self.data_queue.put(("duplicate_group", group))
+                            total_duplicate_groups_found += 1
 
-                # Apply DSU and grouping for THIS pre_filtered_sub_group_paths
-                if current_sub_group_potential_duplicates:
-                    current_sub_group_unique_paths = set()
-                    for p1, p2 in current_sub_group_potential_duplicates:
-                        current_sub_group_unique_paths.add(p1)
-                        current_sub_group_unique_paths.add(p2)
-
-                    dsu = DisjointSet(list(current_sub_group_unique_paths))
-                    for p1, p2 in current_sub_group_potential_duplicates:
-                        dsu.union(p1, p2)
-
-                    current_sub_group_grouped_duplicates = {}
-                    for path in current_sub_group_unique_paths:
-                        root = dsu.find(path)
-                        if root not in current_sub_group_grouped_duplicates:
-                            current_sub_group_grouped_duplicates[root] = []
-                        current_sub_group_grouped_duplicates[root].append(path)
-
-                    current_sub_group_final_duplicate_groups = [group for group in current_sub_group_grouped_duplicates.values() if len(group) > 1]
-
-                    # Send duplicates from THIS pre-filtered group immediately
-                    for group in current_sub_group_final_duplicate_groups:
-                        self.data_queue.put(("duplicate_group", group))
-                        total_duplicate_groups_found += 1
-            
             if self.stop_event.is_set():
                 self.data_queue.put(("status", "Worker stopped during similarity calculation."))
                 self.data_queue.put(("done", None))
@@ -147,6 +676,18 @@ class DuplicateFinderWorker(threading.Thread):
             self.data_queue.put(("done", None)) # Signal completion or error
 
 
+@lru_cache(maxsize=256)
+def _load_thumbnail(path, mtime_ns):
+    # Keyed by (path, mtime_ns) so revisiting a group reuses the decoded
+    # thumbnail while edits to the file still invalidate the entry
+    img = Image.open(path)
+    # Let libjpeg downscale during IDCT so thumbnail() starts from a frame
+    # close to the target size instead of the full-resolution decode
+    img.draft('RGB', (600, 600))
+    img.thumbnail((300, 300), Image.LANCZOS) # Max size for dynamically displayed images
+    return img
+
+
 class DuplicateFinderApp(ctk.CTk):
     def __init__(self):
         super().__init__()
@@ -166,6 +707,7 @@ class DuplicateFinderApp(ctk.CTk):
 
         self.found_groups_count = 0
         self.deleted_pictures_count = 0
+        self._idle_poll_ticks = 0 # Consecutive empty queue drains, for poll backoff
 
         # Initial UI for directory selection
         self.grid_columnconfigure(0, weight=1)
@@ -284,44 +826,65 @@ class DuplicateFinderApp(ctk.CTk):
         self.status_label.configure(text="Starting background processing...")
 
     def process_queue(self):
+        # Drain everything available this tick; defer widget creation so Tk
+        # re-layouts once per tick instead of once per duplicate group
+        new_groups = []
+        worker_done = False
         while True:
             try:
                 msg_type, data = self.data_queue.get_nowait()
                 if msg_type == "status":
                     self.status_label.configure(text=data)
                 elif msg_type == "duplicate_group":
-                    group_paths = data
                     # Only add groups with more than one image to the UI
-                    if len(group_paths) > 1:
-                        duplicate_id = len(self.all_duplicates) # Simple unique ID for the group
-                        self.all_duplicates.append({"id": duplicate_id, "paths": group_paths, "status": "pending"})
-                        self.found_groups_count += 1
-                        self.found_groups_label.configure(text=f"Groups Found: {self.found_groups_count}")
-                        
-                        if self.auto_delete_active:
-                            # If auto-delete is active, immediately process this group
-                            self.selected_image_path = group_paths[0] # Select the first image to keep
-                            self.current_pair_paths = group_paths # Set current group for confirm_selection
-                            self.confirm_selection()
-                            # No need to create a button as it's processed immediately
-                        else:
-                            # In manual mode, add to list and create button
-                            button_text = f"Group {duplicate_id}: {len(group_paths)} images"
-                            btn = ctk.CTkButton(self.duplicate_list_scrollable_frame, text=button_text, command=lambda id=duplicate_id: self.display_selected_group(id))
-                            btn.pack(fill="x", pady=2)
-                            self.duplicate_buttons[duplicate_id] = btn
+                    if len(data) > 1:
+                        new_groups.append(data)
                 elif msg_type == "done":
-                    self.status_label.configure(text="Processing complete.")
-                    self.worker_thread.join() # Ensure thread finishes
-                    break # Stop polling once worker is done
+                    worker_done = True
+                    break
             except queue.Empty:
                 break # No more messages in queue
             except Exception as e:
                 print(f"Error processing queue message: {e}")
                 self.status_label.configure(text=f"Error in GUI: {e}")
                 break
-        
-        self.after(100, self.process_queue) # Schedule next check
+
+        if new_groups:
+            self._render_new_groups(new_groups)
+
+        if worker_done:
+            self.status_label.configure(text="Processing complete.")
+            self.worker_thread.join() # Ensure thread finishes
+
+        # Back off polling once the queue has been idle for a few ticks
+        if new_groups or worker_done:
+            self._idle_poll_ticks = 0
+        else:
+            self._idle_poll_ticks += 1
+        poll_delay_ms = 250 if self._idle_poll_ticks >= 5 else 100
+        self.after(poll_delay_ms, self.process_queue) # Schedule next check
+
+    def _render_new_groups(self, new_groups):
+        for group_paths in new_groups:
+            duplicate_id = len(self.all_duplicates) # Simple unique ID for the group
+            self.all_duplicates.append({"id": duplicate_id, "paths": group_paths, "status": "pending"})
+            self.found_groups_count += 1
+
+            if self.auto_delete_active:
+                # If auto-delete is active, immediately process this group
+                self.selected_image_path = group_paths[0] # Select the first image to keep
+                self.current_pair_paths = group_paths # Set current group for confirm_selection
+                self.confirm_selection()
+                # No need to create a button as it's processed immediately
+            else:
+                # In manual mode, add to list and create button
+                button_text = f"Group {duplicate_id}: {len(group_paths)} images"
+                btn = ctk.CTkButton(self.duplicate_list_scrollable_frame, text=button_text, command=lambda id=duplicate_id: self.display_selected_group(id))
+                btn.pack(fill="x", pady=2)
+                self.duplicate_buttons[duplicate_id] = btn
+
+        self.found_groups_label.configure(text=f"Groups Found: {self.found_groups_count}")
+        self.duplicate_list_scrollable_frame.update_idletasks()
 
     def display_selected_group(self, duplicate_id):
         print(f"DEBUG: display_selected_group called for ID: {duplicate_id}")
@@ -339,9 +902,7 @@ class DuplicateFinderApp(ctk.CTk):
             # Dynamically display images
             for i, path in enumerate(group_paths):
                 try:
-                    img_pil = Image.open(path)
-                    max_size = (300, 300) # Max size for dynamically displayed images
-                    img_pil.thumbnail(max_size, Image.LANCZOS)
+                    img_pil = _load_thumbnail(path, os.stat(path).st_mtime_ns)
 
                     # Create CTkImage and store it on the label to prevent garbage collection
                     ctk_img = ctk.CTkImage(light_image=img_pil, dark_image=img_pil, size=(img_pil.width, img_pil.height))
@@ -363,8 +924,6 @@ class DuplicateFinderApp(ctk.CTk):
                     path_label = ctk.CTkLabel(image_entry_frame, text=Path(path).name, wraplength=280)
                     path_label.grid(row=1, column=0, pady=(5, 0))
 
-                    img_pil.close()
-
                 except FileNotFoundError:
                     error_text = f"File not found:\n{Path(path).name}"
                     error_label = ctk.CTkLabel(self.image_viewer_scrollable_frame, text=error_text, wraplength=280)
@@ -504,68 +1063,6 @@ class DuplicateFinderApp(ctk.CTk):
         print("Viewer cleared and selection reset.")
 
 
-    # Commenting out process_choice as it will be completely replaced
-    # def process_choice(self, choice):
-    #     print(f"DEBUG: Entering process_choice for choice: {choice}")
-    #     if not self.current_pair_paths:
-    #         print("No pair selected to process.")
-    #         return
-
-    #     path1, path2 = self.current_pair_paths
-        
-    #     # Find the processed duplicate item in our list
-    #     processed_duplicate_id = None
-    #     for i, item in enumerate(self.all_duplicates):
-    #         if item["paths"] == (path1, path2):
-    #             processed_duplicate_id = item["id"]
-    #             if choice == "delete_right":
-    #                 item["status"] = "deleted_right"
-    #                 try:
-    #                     os.remove(path2)
-    #                     print(f"Deleted: {path2}")
-    #                 except OSError as e:
-    #                     print(f"Error deleting {path2}: {e}")
-    #                     item["status"] = "deletion_failed"
-    #             elif choice == "delete_left":
-    #                 item["status"] = "deleted_left"
-    #                 try:
-    #                     os.remove(path1)
-    #                     print(f"Deleted: {path1}")
-    #                 except OSError as e:
-    #                     print(f"Error deleting {path1}: {e}")
-    #                     item["status"] = "deletion_failed"
-    #             elif choice == "skip":
-    #                 item["status"] = "skipped"
-    #                 print("Skipped pair.")
-                
-    #             # Update the button appearance/state and remove from future display
-    #             if processed_duplicate_id is not None and processed_duplicate_id in self.duplicate_buttons:
-    #                 btn = self.duplicate_buttons[processed_duplicate_id]
-    #                 btn.pack_forget()  # Remove from layout
-    #                 del self.duplicate_buttons[processed_duplicate_id]
-                
-    #             # Remove the item from self.all_duplicates
-    #             self.all_duplicates = [d for d in self.all_duplicates if d["id"] != processed_duplicate_id]
-    #             break
-
-    #     self.image_label_left.configure(image=self.blank_ctk_image, text="")
-    #     self.image_label_right.configure(image=self.blank_ctk_image, text="")
-    #     self.path_label_left.configure(text="")
-    #     self.path_label_right.configure(text="")
-    #     self.current_pair_paths = None # Clear current selection
-
-    #     # Explicitly clear CTkImage references
-    #     self.ctk_img1 = None
-    #     self.ctk_img2 = None
-
-    #     self.update_idletasks() # Force GUI update
-
-    #     # After processing a pair, if there are still duplicates, or if worker is still running
-    #     # and no more duplicates, just update status if all are processed.
-    #     if not self.all_duplicates and (not self.worker_thread or not self.worker_thread.is_alive()):
-    #         self.status_label.configure(text="All duplicates processed.")
-
-
     def quit_app(self):
         if self.worker_thread and self.worker_thread.is_alive():
             self.worker_thread.stop_event.set() # Signal worker to stop
@@ -595,65 +1092,121 @@ class DuplicateFinderApp(ctk.CTk):
         print("Auto-deletion disabled.")
 
 
+IMAGE_EXTENSIONS = frozenset({'jpg', 'jpeg', 'png', 'bmp', 'tiff', 'webp', 'gif', 'heic'})
+
 def find_image_files(directory_path):
+    # os.scandir reuses the file type cached on each directory entry, avoiding
+    # the per-file stat call and Path allocation that rglob('*') pays
     image_paths = []
-    extensions = ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.webp', '.gif', '.heic']
-    for filepath in Path(directory_path).rglob('*'):
-        if filepath.is_file() and filepath.suffix.lower() in extensions:
-            image_paths.append(filepath)
+    stack = [str(directory_path)]
+    while stack:
+        current_dir = stack.pop()
+        try:
+            with os.scandir(current_dir) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        name = entry.name
+                        dot = name.rfind('.')
+                        if dot >= 0 and name[dot + 1:].lower() in IMAGE_EXTENSIONS:
+                            image_paths.append(entry.path)
+        except OSError as e:
+            print(f"Could not scan directory {current_dir}: {e}")
     return image_paths
 
-def compute_hashes(image_paths):
+def _phash_one(path):
+    # Module-level so it can be pickled into the process pool workers
+    try:
+        img = Image.open(path)
+        # phash only needs a 32x32 grayscale; draft() lets libjpeg decode at a
+        # fraction of full resolution instead of decoding every pixel first
+        img.draft('L', (64, 64))
+        hash_val = imagehash.phash(img)
+        img.close() # Close image to free memory
+        return path, int(str(hash_val), 16) # 64-bit int is a cheaper dict key than ImageHash
+    except Exception as e:
+        print(f"Could not process {path}: {e}")
+        return path, None
+
+def compute_hashes(image_paths, status_callback=None):
     hashes = {}
-    for path in image_paths:
-        try:
-            img = Image.open(path)
-            hash_val = imagehash.phash(img)
-            img.close() # Close image to free memory
-            if hash_val in hashes:
-                hashes[hash_val].append(path)
+    processed = 0
+    # phash is an independent, compute-bound DCT per file, so fan it out
+    # across processes instead of looping under the GIL
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        for path, hash_int in executor.map(_phash_one, image_paths, chunksize=32):
+            processed += 1
+            if status_callback and processed % 256 == 0:
+                status_callback(f"Phase 2: Hashed {processed}/{len(image_paths)} images...")
+            if hash_int is None:
+                continue
+            if hash_int in hashes:
+                hashes[hash_int].append(path)
             else:
-                hashes[hash_val] = [path]
-        except Exception as e:
-            print(f"Could not process {path}: {e}")
-    return {k: v for k, v in hashes.items() if len(v) > 1}
-
-# This function is now mostly integrated into the worker's run method
-# def process_image_groups(image_groups, model, threshold=0.98):
-#     all_duplicate_pairs = []
-#     for group_paths in image_groups.values():
-#         images = []
-#         valid_group_paths = []
-#         for p in group_paths:
-#             try:
-#                 img = Image.open(p)
-#                 images.append(img)
-#                 valid_group_paths.append(p)
-#             except Exception as e:
-#                 print(f"Could not open image {p} for embedding: {e}")
-        
-#         if not images:
-#             continue
-
-#         embeddings = model.encode(images, convert_to_tensor=True)
-#         for img in images:
-#             img.close() # Close images after encoding
-
-#         cos_scores = util.cos_sim(embeddings, embeddings)
-#         for i in range(len(cos_scores) - 1):
-#             for j in range(i + 1, len(cos_scores)):
-#                 if cos_scores[i][j] >= threshold:
-#                     all_duplicate_pairs.append((valid_group_paths[i], valid_group_paths[j]))
-#     return all_duplicate_pairs
-
-# This function is now replaced by the GUI logic
-# def handle_duplicate_pairs_gui(duplicate_pairs):
-#     if not duplicate_pairs:
-#         print("No duplicate pairs to display.")
-#         return
-
-#     app = DuplicateViewerApp(duplicate_pairs)
-#     app.mainloop()
+                hashes[hash_int] = [path]
+    # Singleton hashes are kept: they may still link to near hashes downstream
+    return hashes
+
+def content_fingerprint(path):
+    # File size plus an MD5 of the first 64 KB: cheap to compute, and enough
+    # to confirm that files sharing a phash really are identical copies
+    try:
+        size = os.stat(path).st_size
+        with open(path, 'rb') as f:
+            digest = hashlib.md5(f.read(65536)).hexdigest()
+        return size, digest
+    except OSError as e:
+        print(f"Could not fingerprint {path}: {e}")
+        return None
+
+def group_by_hamming(hashes, confident_distance=2, candidate_distance=6):
+    # Exact-hash grouping discards near-duplicates, which is the whole point of
+    # perceptual hashing. Link hashes within a small Hamming distance instead,
+    # bucketing by the top 16 bits so only plausibly-close hashes are compared.
+    # Components linked entirely at <= confident_distance bits are returned as
+    # duplicates outright; the rest still need CLIP verification.
+    hash_list = list(hashes.keys())
+    if not hash_list:
+        return [], []
+
+    candidate_dsu = IntDSU(len(hash_list))
+    confident_dsu = IntDSU(len(hash_list))
+    buckets = {}
+    for idx, hash_int in enumerate(hash_list):
+        buckets.setdefault(hash_int >> 48, []).append(idx)
+    for bucket in buckets.values():
+        if len(bucket) < 2:
+            continue
+        # All pairwise Hamming distances for the bucket in one vectorized
+        # XOR + popcount; Python only touches the pairs that actually link
+        bucket_hashes = np.array([hash_list[idx] for idx in bucket], dtype=np.uint64)
+        xors = bucket_hashes[:, None] ^ bucket_hashes[None, :]
+        distances = np.unpackbits(xors.view(np.uint8).reshape(len(bucket), len(bucket), 8),
+                                  axis=-1).sum(axis=-1)
+        close_i, close_j = np.nonzero(np.triu(distances <= candidate_distance, k=1))
+        for a_pos, b_pos in zip(close_i.tolist(), close_j.tolist()):
+            idx_a, idx_b = bucket[a_pos], bucket[b_pos]
+            candidate_dsu.union(idx_a, idx_b)
+            if distances[a_pos, b_pos] <= confident_distance:
+                confident_dsu.union(idx_a, idx_b)
+
+    members_per_component = {}
+    for idx in range(len(hash_list)):
+        members_per_component.setdefault(candidate_dsu.find(idx), []).append(idx)
+
+    confident_groups = []
+    candidate_groups = []
+    for members in members_per_component.values():
+        paths = [p for idx in members for p in hashes[hash_list[idx]]]
+        if len(paths) < 2:
+            continue
+        confident_roots = {confident_dsu.find(idx) for idx in members}
+        if len(confident_roots) == 1:
+            confident_groups.append(paths)
+        else:
+            candidate_groups.append(paths)
+    return confident_groups, candidate_groups
 
 if __name__ == "__main__":
     app = DuplicateFinderApp()